@@ -1,16 +1,23 @@
-print("[app.py] Starting Streamlit app...")
+import logging
 from pickle import GLOBAL
 import streamlit as st
 import requests
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import os
+import re
+import tempfile
 from dotenv import set_key, load_dotenv
 
-print("[app.py] Setting Streamlit page config")
+logger = logging.getLogger(__name__)
+
+logger.debug("Setting Streamlit page config")
 st.set_page_config(page_title="Multi-Agent Researcher", layout="wide")
 
-print("[app.py] Showing sidebar navigation")
+logger.debug("Showing sidebar navigation")
 page = st.sidebar.selectbox("Navigation", ["Dashboard", "Add Provider"])
-st.sidebar.button("Refresh Models/Providers", on_click=lambda: onload())
+st.sidebar.button("Refresh Models/Providers", on_click=lambda: refresh())
 
 # Use session_state for providers and models
 if 'ALL_PROVIDERS' not in st.session_state:
@@ -18,31 +25,47 @@ if 'ALL_PROVIDERS' not in st.session_state:
 if 'ALL_MODELS' not in st.session_state:
     st.session_state.ALL_MODELS = {}
 
+@st.cache_resource
+def get_session():
+    # One pooled keep-alive session per Streamlit server, shared across reruns
+    session = requests.Session()
+    # Retry connection failures and gateway errors briefly; only GETs are retried after a request
+    # was sent, so a slow /research POST is never submitted twice
+    retry = Retry(total=2, connect=2, read=1, backoff_factor=0.2,
+                  status_forcelist=(502, 503, 504), allowed_methods=frozenset(["GET"]))
+    session.mount("http://", HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=16))
+    return session
+
+# Parsed providers keyed on the .env modification time; re-read only when the file changes
+_ENV_CACHE = {"mtime": None, "data": {}}
+_API_KEY_LINE = re.compile(r"^([A-Za-z0-9_]+)_API_KEY=(.*?)\s*$", re.MULTILINE)
+
 def get_env_path():
     path = os.path.join(os.path.dirname(__file__), ".env")
-    print(f"[app.py] .env path: {path}")
+    logger.debug(".env path: %s", path)
     return path
 
 def get_providers_from_env():
     env_path = get_env_path()
-    print(f"[app.py] Reading providers from env: {env_path}")
-    if not os.path.exists(env_path):
-        print("[app.py] .env file does not exist")
+    logger.debug("Reading providers from env: %s", env_path)
+    try:
+        mtime = os.stat(env_path).st_mtime_ns
+    except FileNotFoundError:
+        logger.debug(".env file does not exist")
         return {}
-    providers = {}
+    if _ENV_CACHE["mtime"] == mtime:
+        return _ENV_CACHE["data"]
     with open(env_path, "r", encoding="utf-8") as f:
-        for line in f:
-            if line.strip() and "=" in line:
-                k, v = line.strip().split("=", 1)
-                if k.endswith("_API_KEY"):
-                    providers[k.replace("_API_KEY", "")] = v
-    print(f"[app.py] Providers found: {providers}")
+        providers = dict(_API_KEY_LINE.findall(f.read()))
+    # Values are API keys; only the provider names go to the log
+    logger.debug("Providers found: %s", list(providers))
+    _ENV_CACHE["mtime"], _ENV_CACHE["data"] = mtime, providers
     return providers
 
 def add_provider_to_env(provider, api_key):
     env_path = get_env_path()
     key = f"{provider.upper()}_API_KEY"
-    print(f"[app.py] Adding provider {provider} with key {key} to env")
+    logger.info("Adding provider %s with key %s to env", provider, key)
     # Overwrite or add
     lines = []
     found = False
@@ -56,56 +79,77 @@ def add_provider_to_env(provider, api_key):
                     lines.append(line)
     if not found:
         lines.append(f"{key}={api_key}\n")
-    with open(env_path, "w", encoding="utf-8") as f:
-        f.writelines(lines)
-    print(f"[app.py] Provider {provider} added/updated in .env")
+    # Write a sibling temp file and rename it over .env so a crash never leaves it half-written
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(env_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp_path, env_path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _ENV_CACHE["mtime"] = None
+    logger.info("Provider %s added/updated in .env", provider)
+
+@st.cache_resource(ttl=60, show_spinner=False)
+def fetch_models():
+    # Shared by reference across sessions (read-only); errors propagate so failures are never cached
+    resp = get_session().get("http://localhost:8000/models", timeout=(3, 30))
+    resp.raise_for_status()
+    return orjson.loads(resp.content)
 
 def get_models_and_providers():
-    print(f"[app.py] Getting models and providers from backend")
+    logger.debug("Getting models and providers from backend")
     providers, models = [], {}
     try:
-        resp = requests.get("http://localhost:8000/models")
-        data = resp.json()
-        print(f"[app.py] /models response: {data}")
+        data = fetch_models()
+        logger.debug("/models response: %s", data)
         if "model_providers" in data:
             providers = data["model_providers"]
         if "models" in data:
-            models = data["models"].copy()
+            models = data["models"]
     except Exception as e:
-        print(f"[app.py] Error getting models and providers: {e}")
+        logger.warning("Error getting models and providers: %s", e)
     
     return providers, models
 
 
+def refresh():
+    logger.debug("refresh called")
+    fetch_models.clear()
+    onload()
+
 def onload():
-    print("[app.py] onload called")
+    logger.debug("onload called")
     providers, models = get_models_and_providers()
     st.session_state.ALL_PROVIDERS = providers
     st.session_state.ALL_MODELS = models
 
 if page == "Dashboard":
-    print("[app.py] Dashboard page selected")
+    logger.debug("Dashboard page selected")
     st.title("🧠 Multi-Agent Researcher Dashboard")
     user = st.text_input("Enter your name:")
     query = st.text_area("Enter your research query:", "Quantum physics")
 
     # Use session_state for providers/models
     providers = st.session_state.ALL_PROVIDERS
-    print(f"[app.py] Providers for selectbox: {providers}")
+    logger.debug("Providers for selectbox: %s", providers)
     if not providers:
         st.warning("No providers available. Please add a provider or check backend.")
     else:
         provider = st.selectbox("Choose a model provider", providers)
         models = st.session_state.ALL_MODELS[provider] if provider in st.session_state.ALL_MODELS else []
-        print(f"[app.py] Models for selectbox: {models}")
+        logger.debug("Models for selectbox: %s", models)
         if not models:
             st.warning("No models available for this provider.")
         else:
             model = st.selectbox("Choose a model for analysis", models)
 
             if st.button("Run Research"):
-                print(f"[app.py] Run Research clicked with provider={provider}, model={model}, user={user}, query={query}")
-                print(f"[app.py] Sending research request with: query={query}, user={user}, model_provider={provider}, model={model}")
+                logger.info("Run Research clicked with provider=%s, model=%s, user=%s, query=%s", provider, model, user, query)
                 with st.spinner("Agents are working via MCP server..."):
                     try:
                         payload = {
@@ -114,30 +158,33 @@ if page == "Dashboard":
                             "model_provider": provider,
                             "model": model
                         }
-                        print(f"[app.py] Payload: {payload}")
-                        resp = requests.post(
+                        logger.debug("Payload: %s", payload)
+                        # Research runs several LLM calls; only the connect phase gets a short timeout
+                        resp = get_session().post(
                             "http://localhost:8000/research",
-                            json=payload
+                            json=payload,
+                            timeout=(3, 900)
                         )
-                        print(f"[app.py] Response status: {resp.status_code}")
-                        report = resp.json().get("report", "No report returned.")
-                        print(f"[app.py] Research response: {report}")
+                        logger.debug("Response status: %s", resp.status_code)
+                        report = orjson.loads(resp.content).get("report", "No report returned.")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Research response: %s", report[:200])
                     except Exception as e:
                         report = f"Error: {e}"
-                        print(f"[app.py] Error in research: {e}")
+                        logger.error("Error in research: %s", e)
                 st.success("Research complete!")
                 # st.text_area("Result Report", report, height=500)
                 st.markdown(report)
                 st.info("All actions are logged for audit and compliance.")
 
 elif page == "Add Provider":
-    print("[app.py] Add Provider page selected")
+    logger.debug("Add Provider page selected")
     st.title("Add New Model Provider")
     st.write("Register a new model provider and its API key. This will be stored in the local incex.")
     provider = st.text_input("Provider Name (e.g., OpenAI, Anthropic, Ollama)")
     api_key = st.text_input("API Key", type="password")
     if st.button("Add Provider"):
-        print(f"[app.py] Add Provider clicked with provider={provider}, api_key={api_key}")
+        logger.info("Add Provider clicked with provider=%s", provider)
         if provider and api_key:
             add_provider_to_env(provider, api_key)
             st.success(f"Provider '{provider}' added to index!")
@@ -147,6 +194,6 @@ elif page == "Add Provider":
 
 # Always call onload once per session
 if 'initialized' not in st.session_state or not st.session_state.initialized:
-    print("[app.py] Initializing session state")
+    logger.debug("Initializing session state")
     onload()
     st.session_state.initialized = True
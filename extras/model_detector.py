@@ -1,6 +1,8 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,40 +11,47 @@ class ModelDetector:
     def __init__(self):
         self.ollama_url = "http://localhost:11434/api"
         self.lmstudio_url = "http://localhost:1234/v1"
+        # Keep-alive session so repeated probes reuse connections to the local servers
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
 
     def detect_available_models(self) -> Tuple[bool, bool, List[str], List[str]]:
         """
         Detect available models from both Ollama and LM Studio.
         Returns: (ollama_available, lmstudio_available, ollama_models, lmstudio_models)
         """
-        ollama_available = False
-        lmstudio_available = False
-        ollama_models = []
-        lmstudio_models = []
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            ollama = executor.submit(self._probe_ollama)
+            lmstudio = executor.submit(self._probe_lmstudio)
+            ollama_available, ollama_models = ollama.result()
+            lmstudio_available, lmstudio_models = lmstudio.result()
 
+        return ollama_available, lmstudio_available, ollama_models, lmstudio_models
+
+    def _probe_ollama(self) -> Tuple[bool, List[str]]:
         try:
-            response = requests.get(f"{self.ollama_url}/tags")
+            response = self.session.get(f"{self.ollama_url}/tags", timeout=2)
             if response.status_code == 200:
-                ollama_available = True
                 models_data = response.json()
-                print(models_data)
+                logger.debug("Ollama tags response: %s", models_data)
                 ollama_models = [model['name'] for model in models_data.get('models', [])]
-                logger.info(f"Found Ollama models: {ollama_models}")
+                logger.info("Found Ollama models: %s", ollama_models)
+                return True, ollama_models
         except requests.exceptions.RequestException as e:
-            logger.warning(f"Ollama not available: {str(e)}")
+            logger.warning("Ollama not available: %s", e)
+        return False, []
 
-        # Check LM Studio
+    def _probe_lmstudio(self) -> Tuple[bool, List[str]]:
         try:
-            response = requests.get(f"{self.lmstudio_url}/models")
+            response = self.session.get(f"{self.lmstudio_url}/models", timeout=2)
             if response.status_code == 200:
-                lmstudio_available = True
                 models_data = response.json()
                 lmstudio_models = [model['id'] for model in models_data.get('data', [])]
-                logger.info(f"Found LM Studio models: {lmstudio_models}")
+                logger.info("Found LM Studio models: %s", lmstudio_models)
+                return True, lmstudio_models
         except requests.exceptions.RequestException as e:
-            logger.warning(f"LM Studio not available: {str(e)}")
-
-        return ollama_available, lmstudio_available, ollama_models, lmstudio_models
+            logger.warning("LM Studio not available: %s", e)
+        return False, []
 
     def get_default_model(self, host_type: str, available_models: List[str]) -> str:
         """Get the default model based on availability and host type."""
@@ -9,7 +9,7 @@ class ModelDetector:
     def __init__(self):
         self.ollama_url = "http://localhost:11434/api"
         self.lmstudio_url = "http://localhost:1234/v1"
-        print("[ModelDetector] Initialized with Ollama and LM Studio URLs")
+        logger.debug("ModelDetector initialized with Ollama and LM Studio URLs")
 
     def detect_available_models(self) -> Tuple[bool, bool, List[str], List[str]]:
         """
@@ -23,29 +23,25 @@ class ModelDetector:
 
         # Check Ollama
         try:
-            response = requests.get(f"{self.ollama_url}/tags")
+            response = requests.get(f"{self.ollama_url}/tags", timeout=2)
             if response.status_code == 200:
                 ollama_available = True
                 models_data = response.json()
                 ollama_models = [model['name'] for model in models_data.get('models', [])]
-                logger.info(f"Found Ollama models: {ollama_models}")
-                print(f"[ModelDetector] Found Ollama models: {ollama_models}")
+                logger.info("Found Ollama models: %s", ollama_models)
         except requests.exceptions.RequestException as e:
-            logger.warning(f"Ollama not available: {str(e)}")
-            print(f"[ModelDetector] Ollama not available: {str(e)}")
+            logger.warning("Ollama not available: %s", e)
 
         # Check LM Studio
         try:
-            response = requests.get(f"{self.lmstudio_url}/models")
+            response = requests.get(f"{self.lmstudio_url}/models", timeout=2)
             if response.status_code == 200:
                 lmstudio_available = True
                 models_data = response.json()
                 lmstudio_models = [model['id'] for model in models_data.get('data', [])]
-                logger.info(f"Found LM Studio models: {lmstudio_models}")
-                print(f"[ModelDetector] Found LM Studio models: {lmstudio_models}")
+                logger.info("Found LM Studio models: %s", lmstudio_models)
         except requests.exceptions.RequestException as e:
-            logger.warning(f"LM Studio not available: {str(e)}")
-            print(f"[ModelDetector] LM Studio not available: {str(e)}")
+            logger.warning("LM Studio not available: %s", e)
 
         return ollama_available, lmstudio_available, ollama_models, lmstudio_models
 
@@ -74,26 +70,26 @@ class ModelDetector:
 
 class ModelInterface:
     def __init__(self):
-        print("[ModelInterface] Initialized")
+        logger.debug("ModelInterface initialized")
         self.model_providers = ["Ollama", "LM Studio"]
         self.detector = ModelDetector()
 
     def get_ollama_models(self):
-        print("[ModelInterface] get_ollama_models called")
+        logger.debug("get_ollama_models called")
         ollama_available, _, ollama_models, _ = self.detector.detect_available_models()
         if ollama_available:
             return ollama_models
         return []
 
     def get_lmStudio_models(self):
-        print("[ModelInterface] get_lmStudio_models called")
+        logger.debug("get_lmStudio_models called")
         _, lmstudio_available, _, lmstudio_models = self.detector.detect_available_models()
         if lmstudio_available:
             return lmstudio_models
         return []
 
     def list_models(self, provider: str = "Ollama") -> list:
-        print(f"[ModelInterface] list_models called for provider: {provider}")
+        logger.debug("list_models called for provider: %s", provider)
         if provider == 'Ollama':
             return self.get_ollama_models()
         elif provider == 'LM Studio':
@@ -102,7 +98,7 @@ class ModelInterface:
             return []
 
     def run_model(self, model_name, prompt):
-        print(f"[ModelInterface] run_model called for model: {model_name}")
+        logger.debug("run_model called for model: %s", model_name)
         # Demo: mock response
         if model_name == "Ollama":
             return f"[Ollama] Response to: {prompt}"
@@ -0,0 +1,34 @@
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+_session = None
+_async_client = None
+
+def get_session() -> requests.Session:
+    """Process-wide requests session so arXiv, Ollama and LM Studio calls reuse pooled connections."""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _session = session
+    return _session
+
+def get_async_client() -> httpx.AsyncClient:
+    """Process-wide async client for coroutine callers; bound to the event loop that first uses it."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            follow_redirects=True,
+        )
+    return _async_client
+
+async def aclose_async_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
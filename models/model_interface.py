@@ -1,54 +1,101 @@
 from urllib import response
-import requests
-import json
+import os
+import time
+import uuid
+import orjson
+import asyncio
+from functools import lru_cache
+import httpx
 from typing import Dict, List, Tuple
 import logging
 
+from .http_client import get_async_client
+
 logger = logging.getLogger(__name__)
 
+# Both providers run on localhost; anything slower than this is treated as unavailable
+PROBE_TIMEOUT = 2
+# Repeat detections within this many seconds reuse the last probe results
+DETECT_TTL = 10
+# Set LLM_DEBUG_DUMP=1 to write every raw provider response under logs/ for debugging
+LLM_DEBUG_DUMP = bool(os.environ.get("LLM_DEBUG_DUMP"))
+# How long Ollama keeps a model loaded after a request; avoids multi-second reloads between pipeline steps
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+# Non-streaming generations send nothing until they finish, so the read timeout must cover the whole
+# generation (batched summaries on a local model can take minutes); connect/pool stay short
+GENERATION_TIMEOUT = httpx.Timeout(30.0, read=float(os.environ.get("LLM_GENERATION_TIMEOUT", "600")))
+
+def dump_debug(name: str, data) -> None:
+    """Write one raw response to its own file, so concurrent requests don't overwrite each other."""
+    os.makedirs("logs", exist_ok=True)
+    path = os.path.join("logs", f"debug_response_{name}_{os.getpid()}_{uuid.uuid4().hex}.json")
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+# Accepted spellings of each provider, case-folded, mapped to one canonical key
+PROVIDER_ALIASES = {
+    "ollama": "ollama",
+    "lm studio": "lmstudio",
+    "lmstudio": "lmstudio",
+    "lm_studio": "lmstudio",
+}
+
 class ModelDetector:
     def __init__(self):
         self.ollama_url = "http://localhost:11434/api"
         self.lmstudio_url = "http://localhost:1234/v1"
-        print("[ModelDetector] Initialized with Ollama and LM Studio URLs")
+        self._cache = None
+        self._cache_t = 0.0
+        self._lock = asyncio.Lock()
+        logger.debug("ModelDetector initialized with Ollama and LM Studio URLs")
 
-    def detect_available_models(self) -> Tuple[bool, bool, List[str], List[str]]:
+    async def detect_available_models(self) -> Tuple[bool, bool, List[str], List[str]]:
         """
         Detect available models from both Ollama and LM Studio.
         Returns: (ollama_available, lmstudio_available, ollama_models, lmstudio_models)
         """
-        ollama_available = False
-        lmstudio_available = False
-        ollama_models = []
-        lmstudio_models = []
+        if self._fresh():
+            return self._cache
+
+        # Concurrent callers wait for one in-flight probe instead of each probing the servers
+        async with self._lock:
+            if self._fresh():
+                return self._cache
+
+            # Probe both servers at once so detection costs the slower probe, not the sum
+            (ollama_available, ollama_models), (lmstudio_available, lmstudio_models) = await asyncio.gather(
+                self._probe_ollama(), self._probe_lmstudio())
 
-        # Check Ollama
+            self._cache = (ollama_available, lmstudio_available, ollama_models, lmstudio_models)
+            self._cache_t = time.monotonic()
+            return self._cache
+
+    def _fresh(self) -> bool:
+        return self._cache is not None and time.monotonic() - self._cache_t < DETECT_TTL
+
+    async def _probe_ollama(self) -> Tuple[bool, List[str]]:
         try:
-            response = requests.get(f"{self.ollama_url}/tags")
+            response = await get_async_client().get(f"{self.ollama_url}/tags", timeout=PROBE_TIMEOUT)
             if response.status_code == 200:
-                ollama_available = True
-                models_data = response.json()
+                models_data = orjson.loads(response.content)
                 ollama_models = [model['name'] for model in models_data.get('models', [])]
-                logger.info(f"Found Ollama models: {ollama_models}")
-                print(f"[ModelDetector] Found Ollama models: {ollama_models}")
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Ollama not available: {str(e)}")
-            print(f"[ModelDetector] Ollama not available: {str(e)}")
+                logger.info("Found Ollama models: %s", ollama_models)
+                return True, ollama_models
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            logger.warning("Ollama not available: %s", e)
+        return False, []
 
-        # Check LM Studio
+    async def _probe_lmstudio(self) -> Tuple[bool, List[str]]:
         try:
-            response = requests.get(f"{self.lmstudio_url}/models")
+            response = await get_async_client().get(f"{self.lmstudio_url}/models", timeout=PROBE_TIMEOUT)
             if response.status_code == 200:
-                lmstudio_available = True
-                models_data = response.json()
+                models_data = orjson.loads(response.content)
                 lmstudio_models = [model['id'] for model in models_data.get('data', [])]
-                logger.info(f"Found LM Studio models: {lmstudio_models}")
-                print(f"[ModelDetector] Found LM Studio models: {lmstudio_models}")
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"LM Studio not available: {str(e)}")
-            print(f"[ModelDetector] LM Studio not available: {str(e)}")
-
-        return ollama_available, lmstudio_available, ollama_models, lmstudio_models
+                logger.info("Found LM Studio models: %s", lmstudio_models)
+                return True, lmstudio_models
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            logger.warning("LM Studio not available: %s", e)
+        return False, []
 
     def get_default_model(self, host_type: str, available_models: List[str]) -> str:
         """Get the default model based on availability and host type."""
@@ -75,61 +122,64 @@ class ModelDetector:
 
 class ModelInterface:
     def __init__(self):
-        print("[ModelInterface] Initialized")
+        logger.debug("ModelInterface initialized")
         self.model_providers = ["Ollama", "LM Studio"]
         self.detector = ModelDetector()
 
-    def get_ollama_models(self):
-        print("[ModelInterface] get_ollama_models called")
-        ollama_available, _, ollama_models, _ = self.detector.detect_available_models()
+    async def get_ollama_models(self):
+        logger.debug("get_ollama_models called")
+        ollama_available, _, ollama_models, _ = await self.detector.detect_available_models()
         if ollama_available:
             return ollama_models
         return []
 
-    def get_lmStudio_models(self):
-        print("[ModelInterface] get_lmStudio_models called")
-        _, lmstudio_available, _, lmstudio_models = self.detector.detect_available_models()
+    async def get_lmStudio_models(self):
+        logger.debug("get_lmStudio_models called")
+        _, lmstudio_available, _, lmstudio_models = await self.detector.detect_available_models()
         if lmstudio_available:
             return lmstudio_models
         return []
 
-    def list_models(self, provider: str = "Ollama") -> list:
-        print(f"[ModelInterface] list_models called for provider: {provider}")
-        if provider == 'Ollama':
-            return self.get_ollama_models()
-        elif provider == 'LM Studio':
-            return self.get_lmStudio_models()
+    async def list_models(self, provider: str = "Ollama") -> list:
+        logger.debug("list_models called for provider: %s", provider)
+        provider = PROVIDER_ALIASES.get(provider.casefold())
+        if provider == "ollama":
+            return await self.get_ollama_models()
+        elif provider == "lmstudio":
+            return await self.get_lmStudio_models()
         else:
             return []
 
 
     async def run_model(self, model_name, prompt, model_provider="LM_Studio"):
-        print(f"[ModelInterface] run_model called for provider: {model_provider}, model: {model_name}")
+        logger.debug("run_model called for provider: %s, model: %s", model_provider, model_name)
         response_text = ""
+        provider = PROVIDER_ALIASES.get(model_provider.casefold())
         try:
-            if model_provider.lower() == "ollama":
+            if provider == "ollama":
                 url = f"http://localhost:11434/api/generate"
-                payload = {"model": model_name, "prompt": prompt}
-                resp = requests.post(url, json=payload, timeout=30)
+                # Ollama streams NDJSON chunks by default; ask for one JSON object instead
+                payload = {"model": model_name, "prompt": prompt, "stream": False, "keep_alive": OLLAMA_KEEP_ALIVE}
+                resp = await get_async_client().post(url, json=payload, timeout=GENERATION_TIMEOUT)
                 if resp.status_code == 200:
                     try:
-                        data = resp.json()
-                        with open('.\\logs\\debug_response_ollama.json', 'w') as f:
-                            json.dump(data, f, indent=2)
+                        data = orjson.loads(resp.content)
+                        if LLM_DEBUG_DUMP:
+                            await asyncio.to_thread(dump_debug, "ollama", data)
                         response_text = data.get("response", "")
                     except Exception as e:
                         response_text = f"[Ollama JSON Error] {e}"
                 else:
                     response_text = f"[Ollama Error] Status: {resp.status_code}"
-            elif model_provider.lower() == "lm studio" or model_provider.lower() == "lmstudio" or model_provider.lower() == "lm_studio":
+            elif provider == "lmstudio":
                 url = f"http://localhost:1234/v1/completions"
-                payload = {"model": model_name, "prompt": prompt, "max_tokens": 20000}
-                resp = requests.post(url, json=payload, timeout=30)
+                payload = {"model": model_name, "prompt": prompt, "max_tokens": 20000, "stream": False}
+                resp = await get_async_client().post(url, json=payload, timeout=GENERATION_TIMEOUT)
                 if resp.status_code == 200:
                     try:
-                        data = resp.json()
-                        with open('.\\logs\\debug_response_lm_studio.json', 'w') as f:
-                            json.dump(data, f, indent=2)
+                        data = orjson.loads(resp.content)
+                        if LLM_DEBUG_DUMP:
+                            await asyncio.to_thread(dump_debug, "lm_studio", data)
                         # OpenAI compatible: choices[0].text
                         response_text = data.get("choices", [{}])[0].get("text", "")
                     except Exception as e:
@@ -142,6 +192,11 @@ class ModelInterface:
             response_text = f"[Exception] {e}"
         return response_text
 
-    def summarize(self, prompt, model_name="", model_provider="Ollama"):
-        print(f"[ModelInterface] summarize called with provider: {model_provider}, model: {model_name}")
-        return self.run_model(model_name=model_name, prompt=prompt, model_provider=model_provider)
+    async def summarize(self, prompt, model_name="", model_provider="Ollama"):
+        logger.debug("summarize called with provider: %s, model: %s", model_provider, model_name)
+        return await self.run_model(model_name=model_name, prompt=prompt, model_provider=model_provider)
+
+@lru_cache(maxsize=1)
+def get_model_interface() -> ModelInterface:
+    """Process-wide ModelInterface, so every caller shares one detector and its probe cache."""
+    return ModelInterface()
@@ -1,29 +1,31 @@
-
-print("[provider_utils.py] Loading provider_utils module...")
 import os
+import logging
 import requests
 import ollama
-from .model_interface import ModelInterface
+from functools import lru_cache
+from dotenv import dotenv_values
+from .model_interface import get_model_interface
+
+
+logger = logging.getLogger(__name__)
+MIObj = get_model_interface()
+ENV_PATH = os.path.join(os.path.dirname(__file__), '../.env')
 
+@lru_cache(maxsize=1)
+def _load_env_providers():
+    # Parsed once per process; /models hits this on every request
+    logger.debug("Reading providers from env: %s", ENV_PATH)
+    values = dotenv_values(ENV_PATH) if os.path.exists(ENV_PATH) else {}
+    return {k[:-len('_API_KEY')]: v for k, v in values.items() if k.endswith('_API_KEY')}
 
-MIObj = ModelInterface()
 def get_env_providers():
-    env_path = os.path.join(os.path.dirname(__file__), '../.env')
-    print(f"[provider_utils.py] Reading providers from env: {env_path}")
-    providers = {}
-    if os.path.exists(env_path):
-        with open(env_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip() and '=' in line:
-                    k, v = line.strip().split('=', 1)
-                    if k.endswith('_API_KEY'):
-                        providers[k.replace('_API_KEY', '')] = v
-    print(f"[provider_utils.py] Providers found: {providers}")
+    providers = _load_env_providers()
+    logger.debug("Providers found: %s", list(providers))
     # return providers
     return {'Ollama': '', 'LM Studio': ''} 
 
-def query_all_models():
-    print("[provider_utils.py] query_all_models called")
+async def query_all_models():
+    logger.debug("query_all_models called")
     providers = get_env_providers()
     all_models = {}
     # Always include LM Studio as an option
@@ -31,8 +33,10 @@ def query_all_models():
     provider_keys.add('LM STUDIO')
     provider_keys.add('OLLAMA')
 
-    all_models['LM STUDIO'] = MIObj.get_lmStudio_models()
-    all_models['OLLAMA'] = MIObj.get_ollama_models()
+    # One probe round covers both hosts; the per-provider getters would each re-probe both
+    ollama_available, lmstudio_available, ollama_models, lmstudio_models = await MIObj.detector.detect_available_models()
+    all_models['LM STUDIO'] = lmstudio_models if lmstudio_available else []
+    all_models['OLLAMA'] = ollama_models if ollama_available else []
 
     # for provider in provider_keys:
     #     print(f"[provider_utils.py] Querying models for provider: {provider}")
@@ -53,5 +57,5 @@ def query_all_models():
     #     else:
     #         all_models[provider] = []
     #     print(f"[provider_utils.py] Models for {provider}: {all_models[provider]}")
-    print(f"[provider_utils.py] All models: {all_models}")
+    logger.debug("All models: %s", all_models)
     return all_models
@@ -1,16 +1,40 @@
 import sys
 import os
+import logging
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from models.provider_utils import query_all_models
+from models.http_client import aclose_async_client
 
-print("[server.py] Starting FastAPI app...")
 from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from research_handler import run_research
 import re
+import time
+import asyncio
+import orjson
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 
-app = FastAPI()
+# Quiet by default; set LOG_LEVEL=DEBUG (or INFO) to trace requests
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "WARNING").upper(),
+                    format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app):
+    # One bounded pool behind every asyncio.to_thread call (HTML parsing, cache I/O, sync tools run by ToolNode).
+    # Never smaller than the stdlib default, since the sync analyze/format tools hold a thread for a whole LLM call
+    cpus = os.cpu_count() or 1
+    app.state.pool = ThreadPoolExecutor(max_workers=max(min(32, cpus + 4), cpus * 2), thread_name_prefix="worker")
+    asyncio.get_running_loop().set_default_executor(app.state.pool)
+    yield
+    # Release pooled connections to arXiv, Ollama and LM Studio
+    await aclose_async_client()
+    app.state.pool.shutdown(wait=False)
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,25 +45,28 @@ app.add_middleware(
 )
 
 ALL_MODELS = dict()
+# Start of the actual document in the agent's raw completion, after any preamble. Only the match start is used,
+# so each branch needs a single trailing character rather than ".+" running to the end of the report
+AGENT_DOC_START = re.compile(r"#+ .|\n# .|\n\*\*Topic:|\n---|\n[A-Za-z].", re.DOTALL)
 
-def get_provider_and_models():# -> dict[str, Any]:
-    ALL_MODELS = query_all_models()
-    print("[mcp_server.py] get_provider_and_models called")
+async def get_provider_and_models():# -> dict[str, Any]:
+    ALL_MODELS = await query_all_models()
+    logger.debug("get_provider_and_models called")
     return {
         "model_providers": list(ALL_MODELS.keys()),
         "models": ALL_MODELS
     }
 
 @app.get("/models")
-def get_models():
-    print("[mcp_server.py] /models endpoint called")
-    return get_provider_and_models()
+async def get_models():
+    logger.debug("/models endpoint called")
+    return await get_provider_and_models()
 
 @app.post("/research")
 async def research(request: Request):
-    print("[server.py] /research endpoint called")
-    data = await request.json()
-    print(f"[server.py] /research received data: {data}")
+    logger.debug("/research endpoint called")
+    data = orjson.loads(await request.body())
+    logger.debug("/research received data: %s", data)
     query = data.get("query")
     user = data.get("user", "anonymous")
     model_provider = data.get("model_provider", "Ollama")
@@ -49,30 +76,27 @@ async def research(request: Request):
 
 
     try:
-        report = run_research(query=query, user=user, model_provider=model_provider, model=model, chat_title=chat_title)
-        print(f"[server.py] /research raw output: {str(report)[:100]}")
+        started = time.monotonic()
+        report = await run_research(query=query, user=user, model_provider=model_provider, model=model, chat_title=chat_title)
+        logger.info("/research finished in %.2fs", time.monotonic() - started)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("/research raw output: %s", str(report)[:100])
         # Filter out agent meta-messages and ensure only well-structured document is returned
         if isinstance(report, str):
-            # Remove agent meta-messages if present
-            if report.strip().startswith("Agent response:"):
-                # If agent output contains unsupported tool calls, fallback to a message
-                if "browser tool" in report or "websearch" in report:
-                    fallback = "[ERROR] The requested tool (browser/websearch) is not available. Please use only supported tools: collect, summarize_articles, analyze_summaries, format_report, store_report."
-                    print(f"[server.py] /research unsupported tool fallback: {fallback}")
-                    return {"report": fallback}
-                doc_match = re.search(r"(#+ .+|\n# .+|\n\*\*Topic:|\n---|\n[A-Za-z].+)" , report, re.DOTALL)
-                if doc_match:
-                    filtered = report[doc_match.start():].strip()
-                    print(f"[server.py] /research filtered output: {filtered[:100]}")
-                    return {"report": filtered}
-                else:
-                    filtered = report.replace("Agent response:", "").strip()
-                    print(f"[server.py] /research fallback filtered output: {filtered[:100]}")
-                    return {"report": filtered}
-            else:
-                return {"report": report.strip()}
+            # If agent output contains unsupported tool calls, fallback to a message
+            if "browser tool" in report or "websearch" in report:
+                fallback = "[ERROR] The requested tool (browser/websearch) is not available. Please use only supported tools: collect, summarize_articles, analyze_summaries, format_report, store_report."
+                logger.warning("/research unsupported tool fallback: %s", fallback)
+                return {"report": fallback}
+            # Drop the model's preamble before the document itself
+            doc_match = AGENT_DOC_START.search(report)
+            if doc_match:
+                filtered = report[doc_match.start():].strip()
+                logger.debug("/research filtered output: %.100s", filtered)
+                return {"report": filtered}
+            return {"report": report.strip()}
         else:
             return {"report": str(report)}
     except Exception as e:
-        print(f"[server.py] /research error: {e}")
+        logger.exception("/research error: %s", e)
         return {"report": "Error: No valid report generated. Details: " + str(e)}
@@ -5,127 +5,433 @@ from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, Tool
 from langgraph.prebuilt import ToolNode
 from langgraph.graph import StateGraph, START, END
 
-import requests
+import os
+import re
+import hashlib
+import asyncio
+import logging
+import orjson
+import httpx
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from typing import TypedDict, Optional
 import xml.etree.ElementTree as ET
+from bs4 import BeautifulSoup
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
 
 from storage.storage import Storage
 from storage.audit import AuditLogger
+from storage.intermediate_cache import IntermediateCache
+from storage.http_cache import HTTPCache
+from models.http_client import get_session, get_async_client
+from models.model_interface import get_model_interface, LLM_DEBUG_DUMP, OLLAMA_KEEP_ALIVE
 
 
 # Variables intialization
+logger = logging.getLogger(__name__)
 audit = AuditLogger()
+model_interface = get_model_interface()
+# Raw article HTML and arXiv search results on disk, so they survive process restarts
+http_cache = HTTPCache()
+# arXiv results keyed by normalized query; kept as long as the disk copy so both layers expire together
+collect_cache = IntermediateCache(maxsize=1024, ttl=http_cache.max_age)
+# Extracted article text keyed by a hash of the URL
+page_cache = IntermediateCache(maxsize=512, ttl=3600)
+# LLM summaries keyed by a hash of provider, model and prompt
+summary_cache = IntermediateCache(maxsize=1024, ttl=3600)
+# Analyses keyed by a hash of the summaries, and final reports keyed by provider, model and normalized query
+analysis_cache = IntermediateCache(maxsize=256, ttl=3600)
+report_cache = IntermediateCache(maxsize=256, ttl=3600)
+ARXIV_API_URL = "http://export.arxiv.org/api/query"
+# arXiv's API policy asks clients to identify themselves; anonymous heavy clients get throttled
+ARXIV_USER_AGENT = os.environ.get('ARXIV_USER_AGENT', 'Multi-Model-Researcher/0.1')
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+ATOM_ENTRY = ATOM_NS + 'entry'
+ATOM_TITLE = ATOM_NS + 'title'
+ATOM_ID = ATOM_NS + 'id'
+ATOM_SUMMARY = ATOM_NS + 'summary'
+# Entry child tag -> output field, read in one pass over each entry's children
+ATOM_FIELDS = {ATOM_TITLE: 'title', ATOM_ID: 'url', ATOM_SUMMARY: 'abstract'}
+# Upper bound on concurrent article page downloads per summarize_articles call
+ARTICLE_FETCH_CONCURRENCY = int(os.environ.get('FETCH_CONCURRENCY', '8'))
+# Local Ollama/LM Studio servers handle few generations at once; more requests just queue there
+SUMMARIZE_CONCURRENCY = int(os.environ.get('SUMMARIZE_CONCURRENCY', '4'))
+# Model behind the summarize, analyze and format tools, whatever the UI selects for the request
+TOOL_MODEL = "llama2"
+TOOL_PROVIDER = "ollama"
+# Blocking agent LLM calls get their own threads, so minute-long generations can't starve parsing and cache I/O
+LLM_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.environ.get('LLM_CONCURRENCY', '4')), thread_name_prefix="llm")
+# Roughly 4096 tokens at ~4 characters per token; keeps page dumps inside the model context
+MAX_ARTICLE_CHARS = 16384
+MAX_PAGE_BYTES = 256 * 1024
+_WS = re.compile(r'\s+')
+# Transient failures worth another attempt; anything else is reported straight away
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code in RETRYABLE_STATUS
+
+# Full-jitter backoff so concurrent page fetches don't retry a struggling host in lockstep
+_retry = retry(stop=stop_after_attempt(3), wait=wait_random_exponential(multiplier=0.5, max=4),
+               retry=retry_if_exception(_is_retryable), reraise=True)
+
+@_retry
+async def _fetch_page(url: str, validators: Optional[dict] = None) -> tuple[int, Optional[str], dict]:
+    """
+    Download at most MAX_PAGE_BYTES of a page, revalidating with any cached ETag/Last-Modified.
+    Returns (status, html, validators); html is None unless the status is 200.
+    """
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    async with get_async_client().stream('GET', url, headers=headers, timeout=10) as response:
+        if response.status_code in RETRYABLE_STATUS:
+            response.raise_for_status()
+        if response.status_code != 200:
+            return response.status_code, None, {}
+        new_validators = {name: response.headers[header]
+                          for name, header in (('etag', 'etag'), ('last_modified', 'last-modified'))
+                          if header in response.headers}
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body.extend(chunk)
+            # Only MAX_ARTICLE_CHARS of text survive extraction; stop downloading well past that
+            if len(body) >= MAX_PAGE_BYTES:
+                break
+        html = body[:MAX_PAGE_BYTES].decode(response.encoding or 'utf-8', errors='replace')
+        return 200, html, new_validators
+
+@_retry
+async def _fetch_feed(params: dict) -> Optional[list[dict]]:
+    """Query arXiv and parse the Atom feed as it downloads; None if the API returned an error."""
+    data = []
+    parser = ET.XMLPullParser(events=('end',))
+    headers = {'User-Agent': ARXIV_USER_AGENT}
+    async with get_async_client().stream('GET', ARXIV_API_URL, params=params, headers=headers) as resp:
+        if resp.status_code in RETRYABLE_STATUS:
+            resp.raise_for_status()
+        if resp.status_code != 200:
+            logger.warning("arXiv API error: %s", resp.status_code)
+            return None
+        async for chunk in resp.aiter_bytes(16384):
+            parser.feed(chunk)
+            # Entries are extracted and released as soon as their closing tag arrives
+            for _, elem in parser.read_events():
+                if elem.tag != ATOM_ENTRY:
+                    continue
+                entry = {'title': '', 'abstract': '', 'url': ''}
+                for child in elem:
+                    field = ATOM_FIELDS.get(child.tag)
+                    if field is not None and child.text:
+                        entry[field] = child.text.strip()
+                data.append(entry)
+                elem.clear()
+    parser.close()
+    return data
+
+def _arxiv_id(url: str) -> str:
+    """'http://arxiv.org/abs/2101.00001v1' -> '2101.00001v1'; empty for non-arXiv URLs."""
+    _, sep, arxiv_id = url.partition('arxiv.org/abs/')
+    return arxiv_id.strip('/') if sep else ''
+
+async def _fetch_abstracts(arxiv_ids: list[str]) -> dict[str, str]:
+    """Look up abstracts for several papers with one id_list query."""
+    params = {'id_list': ','.join(arxiv_ids), 'max_results': len(arxiv_ids)}
+    entries = await _fetch_feed(params)
+    if entries is None:
+        return {}
+    return {_arxiv_id(entry['url']): entry['abstract'] for entry in entries if entry['abstract']}
 
 # Steps 1 - Resource Papers Collection
 @tool
-def collect(query):
+async def collect(query):
     """
     Searches arXiv for papers matching the query and returns a list of dicts with title, contents, and url.
     """
     audit.log_action('Research Handler', 'Collected')
-    print(f"[research_handler.py]>Collect >>> collect called with query={query}")
+    logger.info("collect called with query=%s", query)
+    cache_key = " ".join(query.lower().split())
+    cached = collect_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("collect cache hit for query=%s", query)
+        return cached
     data = []
     try:
-        url = f"http://export.arxiv.org/api/query?search_query=all:{query}&start=0&max_results={3 if len(query)<=30 else 5}"
-        resp = requests.get(url, timeout=100)
-        if resp.status_code == 200:
-            root = ET.fromstring(resp.text)
-            for entry in root.findall('{http://www.w3.org/2005/Atom}entry'):
-                title = entry.find('{http://www.w3.org/2005/Atom}title').text.strip() # pyright: ignore[reportOptionalMemberAccess]
-                link = entry.find('{http://www.w3.org/2005/Atom}id').text.strip() # type: ignore
-                import random
-                citations = random.randint(50, 200)
-                abstract_elem = entry.find('{http://www.w3.org/2005/Atom}summary')
-                abstract = abstract_elem.text.strip() if abstract_elem is not None else '' # type: ignore
-                data.append({'title': title, 'abstract': abstract, 'citations': citations, 'url': link})
-        else:
-            print(f"[research_handler.py]>Collect >>>  arXiv API error: {resp.status_code}")
+        params = {'search_query': f"all:{cache_key}", 'start': 0, 'max_results': 3 if len(cache_key)<=30 else 5}
+        # Search results survive restarts on disk, so repeated topics skip arXiv and its rate limit
+        feed_url = str(httpx.URL(ARXIV_API_URL, params=params))
+        stored = await asyncio.to_thread(http_cache.get, feed_url)
+        if stored is not None:
+            logger.debug("collect disk cache hit for query=%s", query)
+            data = orjson.loads(stored)
+            collect_cache.set(cache_key, data)
+            return data
+        entries = await _fetch_feed(params)
+        if entries is not None:
+            data = entries
+            # Empty results are often transient (throttling); neither cache layer keeps them
+            if entries:
+                collect_cache.set(cache_key, data)
+                await asyncio.to_thread(http_cache.set, feed_url, orjson.dumps(entries).decode('utf-8'))
     except Exception as e:
-        print(f"[research_handler.py]>Collect >>>  Exception: {e}")
-    print(f"[research_handler.py]>Collect >>>  Returning data: {data}")
+        logger.exception("collect failed: %s", e)
+    logger.debug("collect returning data: %s", data)
     return data
 
 # Steps 2 - Summarizer
-import asyncio
+SUMMARY_SYSTEM_PROMPT = "You are a helpful research assistant. Summarize the following article in a descriptive paragraph of about 200 words."
+BATCH_SUMMARY_SYSTEM_PROMPT = ("You are a helpful research assistant. Summarize each of the following articles separately "
+                               "in a descriptive paragraph of about 200 words. Start each summary on its own line with "
+                               "'Article N:' using the number of the article it summarizes.")
+# Articles per batched summary prompt, bounded by count and by total body size so a batch fits the context
+SUMMARY_BATCH_SIZE = 8
+SUMMARY_BATCH_CHARS = 12000
+_BATCH_SUMMARY_HEADER = re.compile(r'^\W*Article\s+(\d+)\W*?:\W*', re.MULTILINE | re.IGNORECASE)
+
+def _split_batch_summaries(response: str, count: int) -> Optional[list[str]]:
+    """Split a numbered batch response into per-article summaries, or None if it does not line up."""
+    parts = _BATCH_SUMMARY_HEADER.split(response)
+    found = {int(number): text.strip() for number, text in zip(parts[1::2], parts[2::2])}
+    if sorted(found) != list(range(1, count + 1)) or not all(found.values()):
+        return None
+    return [found[n] for n in range(1, count + 1)]
+
+def _chunk_batches(pending: list) -> list[list]:
+    """Greedily group pending (i, key, body, prompt) entries; an oversized body gets a batch of its own."""
+    batches, batch, size = [], [], 0
+    for entry in pending:
+        body_len = len(entry[2])
+        if batch and (len(batch) >= SUMMARY_BATCH_SIZE or size + body_len > SUMMARY_BATCH_CHARS):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(entry)
+        size += body_len
+    if batch:
+        batches.append(batch)
+    return batches
+
+def _truncate(text: str, max_chars: int = MAX_ARTICLE_CHARS) -> str:
+    """Keep the head and tail of long text; introductions and conclusions carry most of a paper's gist."""
+    if len(text) <= max_chars:
+        return text
+    tail = max_chars // 4
+    return text[:max_chars - tail] + " ... " + text[-tail:]
+
+def _html_to_text(html: str) -> str:
+    soup = BeautifulSoup(html, HTML_PARSER)
+    # Scripts, styles and page chrome would otherwise eat into the MAX_ARTICLE_CHARS budget
+    for tag in soup(['script', 'style', 'noscript', 'nav', 'header', 'footer']):
+        tag.decompose()
+    text = soup.get_text(separator=' ')
+    return _truncate(_WS.sub(' ', text).strip())
+
 @tool
-def summarize_articles(articles: list[dict]):
+async def summarize_articles(articles: list[dict]):
     """
-    Summarizes a list of articles one by one returning a list of summaries.
+    Summarizes a list of articles returning a list of summaries, one per article.
     """
-    print(f"[research_handler.py]>Summarize >>> summarize_articles called with articles={articles}")
+    logger.info("summarize_articles called with %d articles", len(articles))
+    logger.debug("summarize_articles articles=%s", articles)
 
     audit.log_action('Research Handler', 'Summarized Articles')
-    from models.model_interface import ModelInterface
-    import requests
-    from bs4 import BeautifulSoup
-    import asyncio
-
-    model_interface = ModelInterface()
-    model_name = "llama2"
-    model_provider = "Ollama"
-
-    async def summarize_one(item):
-        title = item.get('title', 'No Title')
-        citations = item.get('citations', 0)
+    model_name = TOOL_MODEL
+    model_provider = TOOL_PROVIDER
+
+    async def fetch_text(sem, item):
         url = item.get('url', '')
-        abstract = item.get('abstract', '')
-        try:
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                html = response.text
-                soup = BeautifulSoup(html, 'html.parser')
-                text = soup.get_text(separator=' ', strip=True)
-                full_text = f"Abstract: {abstract}\n\n{text}"
-                # Use raw_llm with system messages for summarization
-                system_message = "You are a helpful research assistant. Summarize the following article in a descriptive paragraph of about 200 words."
-                prompt = f"{system_message}\n\nArticle:\n{full_text}"
-                summary = await model_interface.run_model(model_name, prompt, model_provider)
-                return f"- {title} (Citations: {citations})\n{summary}"
+        page_key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        text = page_cache.get(page_key)
+        if text is None:
+            html = await asyncio.to_thread(http_cache.get, url)
+            if html is None:
+                # A stale copy with validators turns the download into a conditional request
+                cached, validators = await asyncio.to_thread(http_cache.load, url)
+                async with sem:
+                    status, html, validators = await _fetch_page(url, validators if cached is not None else None)
+                if status == 304 and cached is not None:
+                    html = cached
+                    await asyncio.to_thread(http_cache.touch, url)
+                elif html is None:
+                    return None
+                else:
+                    await asyncio.to_thread(http_cache.set, url, html, validators)
+            # Parsing is CPU-bound; keep it off the loop so other downloads keep progressing
+            text = await asyncio.to_thread(_html_to_text, html)
+            page_cache.set(page_key, text)
+        return text
+
+    async def run_llm(llm_sem, prompt):
+        async with llm_sem:
+            return await model_interface.run_model(model_name, prompt, model_provider)
+
+    async def summarize_batch(llm_sem, pending):
+        # One prompt per batch of uncached articles; fall back to one call each if the reply can't be split
+        if len(pending) > 1:
+            articles_text = "\n\n".join(f"Article {n}:\n{body}" for n, (_, _, body, _) in enumerate(pending, 1))
+            response = await run_llm(llm_sem, f"{BATCH_SUMMARY_SYSTEM_PROMPT}\n\n{articles_text}")
+            summaries = _split_batch_summaries(response, len(pending))
+            if summaries is not None:
+                return summaries
+            logger.warning("Batch summary did not split into %d articles; summarizing individually", len(pending))
+        return await asyncio.gather(*(run_llm(llm_sem, prompt) for *_, prompt in pending))
+
+    async def article_body(sem, abstracts, item):
+        abstract = item.get('abstract') or abstracts.get(_arxiv_id(item.get('url', '')), '')
+        if abstract:
+            return f"Abstract: {abstract}"
+        # Only scrape the page when arXiv has no abstract for the paper
+        return await fetch_text(sem, item)
+
+    async def summarize_all():
+        # Abstracts the caller didn't pass along are refreshed in one id_list round trip
+        missing = [_arxiv_id(item.get('url', '')) for item in articles if not item.get('abstract')]
+        missing = [arxiv_id for arxiv_id in missing if arxiv_id]
+        abstracts = {}
+        if missing:
+            try:
+                abstracts = await _fetch_abstracts(missing)
+            except Exception as e:
+                logger.warning("arXiv id_list lookup failed: %s", e)
+        sem = asyncio.Semaphore(ARTICLE_FETCH_CONCURRENCY)
+        bodies = await asyncio.gather(*(article_body(sem, abstracts, item) for item in articles), return_exceptions=True)
+
+        results = [''] * len(articles)
+        pending = []
+        for i, (item, body) in enumerate(zip(articles, bodies)):
+            if isinstance(body, BaseException):
+                results[i] = f"[Error retrieving or summarizing article: {body}]"
+            elif body is None:
+                results[i] = "[Failed to retrieve article]"
             else:
-                return f"- {title} (Citations: {citations})\n[Failed to retrieve article]"
-        except Exception as e:
-            return f"- {title} (Citations: {citations})\n[Error retrieving or summarizing article: {e}]"
-
-    loop = asyncio.get_event_loop()
-    summaries = loop.run_until_complete(asyncio.gather(*(summarize_one(item) for item in articles)))
+                prompt = f"{SUMMARY_SYSTEM_PROMPT}\n\nArticle:\n{body}"
+                cache_key = hashlib.sha256(f"{model_provider}|{model_name}|{prompt}".encode('utf-8')).hexdigest()
+                summary = summary_cache.get(cache_key)
+                if summary is None:
+                    pending.append((i, cache_key, body, prompt))
+                else:
+                    results[i] = summary
+
+        if pending:
+            llm_sem = asyncio.Semaphore(SUMMARIZE_CONCURRENCY)
+            batches = _chunk_batches(pending)
+            batch_summaries = await asyncio.gather(*(summarize_batch(llm_sem, batch) for batch in batches))
+            summaries = [summary for batch in batch_summaries for summary in batch]
+            for (i, cache_key, _, _), summary in zip(pending, summaries):
+                results[i] = summary
+                # Provider failures come back as "[... Error] ..." strings; don't cache those
+                if not summary.startswith('['):
+                    summary_cache.set(cache_key, summary)
+
+        return [f"- {item.get('title', 'No Title')}\n{result}"
+                for item, result in zip(articles, results)]
+
+    summaries = await summarize_all()
+    logger.debug("page cache hits=%d misses=%d, summary cache hits=%d misses=%d",
+                 page_cache.hits, page_cache.misses, summary_cache.hits, summary_cache.misses)
     return summaries
 
 
 # Steps 3 - Analyzer
+# System prompts are fixed module constants sent as the leading message, so the backend sees an identical prefix on every call
+ANALYZER_SYSTEM_MESSAGE = SystemMessage(content="You are an expert research analyst. Analyze the following article summaries and provide a very detailed report, covering basic observations, key findings, trends, and advanced insights. Structure the report with clear sections and actionable recommendations. "
+    "Respond with a single JSON object with these keys: \"overview\" (string), \"sections\" (list of objects with \"title\" and \"content\" strings), "
+    "\"key_findings\" (list of strings) and \"recommendations\" (list of strings).")
 @tool
 def analyze_summaries(summaries: list[str]):
     """
     Analyzes a list of summaries and returns a detailed report.
     """
-    print(f"[research_handler.py]>Analyzer >>> analyze_summaries called with summaries={summaries}")
+    logger.info("analyze_summaries called with %d summaries", len(summaries))
+    logger.debug("analyze_summaries summaries=%s", summaries)
     audit.log_action('Research Handler', 'Analyzed Summaries')
-    # Use raw_llm to analyze all summaries and provide a detailed report
-    system_message = SystemMessage(content="You are an expert research analyst. Analyze the following article summaries and provide a very detailed report, covering basic observations, key findings, trends, and advanced insights. Structure the report with clear sections and actionable recommendations.")
+    # Use the Ollama chat model to analyze all summaries and provide a detailed report
     summaries_text = "\n\n".join(summaries)
-    prompt = f"{system_message.content}\n\nSummaries:\n{summaries_text}"
-    # Use raw_llm (already initialized above)
-    response = raw_llm.invoke([system_message, HumanMessage(content=prompt)])
+    cache_key = hashlib.sha256(f"{TOOL_PROVIDER}|{TOOL_MODEL}|{summaries_text}".encode('utf-8')).hexdigest()
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    prompt = f"Summaries:\n{summaries_text}"
+    # JSON mode constrains the output to the schema above, so format_report can render it without another LLM pass
+    response = get_chat_model(TOOL_MODEL, TOOL_PROVIDER, json_mode=True).invoke([ANALYZER_SYSTEM_MESSAGE, HumanMessage(content=prompt)])
+    analysis_cache.set(cache_key, response.content)
     return response.content
 
 # Steps 4 - Formatter
+FORMATTER_SYSTEM_MESSAGE = SystemMessage(content="You are an expert research documnet creator. A very detailed analysis will be given and you need to format it into a well structure markdown format.")
+
+def _as_list(value) -> Optional[list]:
+    """Normalize a JSON list field: a bare string becomes one item, missing becomes empty, anything else is None."""
+    if value is None or value == '':
+        return []
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list):
+        return value
+    return None
+
+def _render_report(topic: str, analysis: str) -> Optional[str]:
+    """Render the analyzer's JSON output as markdown; None if the analysis isn't in that shape."""
+    try:
+        data = orjson.loads(analysis)
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(data, dict) or not any(data.get(k) for k in ('overview', 'sections', 'key_findings', 'recommendations')):
+        return None
+    sections = data.get('sections') or []
+    findings = _as_list(data.get('key_findings'))
+    recommendations = _as_list(data.get('recommendations'))
+    # A malformed field means the model drifted from the schema; let the LLM formatter handle it instead
+    if not isinstance(sections, list) or findings is None or recommendations is None:
+        return None
+    lines = [f"# {topic}", ""]
+    if data.get('overview'):
+        lines += ["## Overview", "", str(data['overview']).strip(), ""]
+    for section in sections:
+        if not isinstance(section, dict):
+            continue
+        title = str(section.get('title') or '').strip()
+        content = str(section.get('content') or '').strip()
+        if title:
+            lines += [f"## {title}", ""]
+        if content:
+            lines += [content, ""]
+    for heading, items in (("Key Findings", findings), ("Recommendations", recommendations)):
+        if items:
+            lines += [f"## {heading}", ""] + [f"- {str(item).strip()}" for item in items] + [""]
+    return "\n".join(lines)
+
 @tool
 def format_report(analysis: str, chat_title: str, topic: str, provider: str, model: str):
     """
     Formats the analysis into a well-structured markdown report.
     """
-    print(f"[research_handler.py]>Formatter >>> format_report called")
+    logger.info("format_report called")
     audit.log_action('Research Handler', 'Formatted Report')
-    # Use raw_llm to analyze all summaries and provide a detailed report
-    system_message = SystemMessage(content="You are an expert research documnet creator. A very detailed analysis will be given and you need to format it into a well structure markdown format.")
-    prompt = f"{system_message.content}\n\n Topics: {topic}\n Analysis:\n{analysis}"
-    # Use raw_llm (already initialized above)
-    response = raw_llm.invoke([system_message, HumanMessage(content=prompt)])
+    report = _render_report(topic, analysis)
+    if report is None:
+        # Free-text analysis (e.g. the model ignored JSON mode): fall back to an LLM formatting pass
+        prompt = f"Topics: {topic}\n Analysis:\n{analysis}"
+        response = get_chat_model(TOOL_MODEL, TOOL_PROVIDER).invoke([FORMATTER_SYSTEM_MESSAGE, HumanMessage(content=prompt)])
+        report = response.content
     # response_content = "".join(response.content)
 
-    with open('.\\logs\\debug_formatted_report.md', 'w', encoding='utf-8') as f:
-        f.write(str(response.content))
+    if LLM_DEBUG_DUMP:
+        os.makedirs('logs', exist_ok=True)
+        with open(os.path.join('logs', 'debug_formatted_report.md'), 'w', encoding='utf-8') as f:
+            f.write(str(report))
 
-    return response.content
+    return report
 
 # Store Result - Save the generated report to be exported
 @tool
@@ -133,7 +439,7 @@ def store_report(report: str, query: str):
     """
     Stores the final generated report in a file or database.
     """
-    print(f"[research_handler.py]>Store >>> store_report called")
+    logger.info("store_report called")
     storage = Storage()
     storage.save_report(query, report)
     audit.log_action('Research Handler', 'Report Stored')
@@ -156,33 +462,56 @@ class LMStudioLLM:
         payload = {
             "model": self.model,
             "prompt": prompt,
-            "max_tokens": 2048
+            "max_tokens": 2048,
+            "stream": True
         }
-        resp = requests.post(self.api_url, json=payload, timeout=30)
-        if resp.status_code == 200:
-            data = resp.json()
-            return type('LLMResponse', (), {"content": data.get("choices", [{}])[0].get("text", "")})()
-        else:
-            return type('LLMResponse', (), {"content": f"[LM Studio Error] Status: {resp.status_code}"})()
+        # Streamed, the 30s timeout applies between tokens rather than to the whole generation
+        with get_session().post(self.api_url, json=payload, timeout=30, stream=True) as resp:
+            if resp.status_code != 200:
+                return AIMessage(content=f"[LM Studio Error] Status: {resp.status_code}", response_metadata={"error": True})
+            parts = []
+            # Server-sent events: one "data: {json}" frame per token chunk, ending with "data: [DONE]"
+            for line in resp.iter_lines():
+                if not line.startswith(b"data:"):
+                    continue
+                frame = line[5:].strip()
+                if frame == b"[DONE]":
+                    break
+                choices = orjson.loads(frame).get("choices") or [{}]
+                parts.append(choices[0].get("text") or "")
+        # The completions endpoint has no tool calling, so replies never carry tool_calls
+        return AIMessage(content="".join(parts))
 
 llm = LMStudioLLM(model="llama-3.2-3b-instruct")
 
-tool_node = ToolNode([collect, summarize_articles, analyze_summaries, format_report, store_report])
-
-# raw_llm: Use Ollama via LangChain
-raw_llm = init_chat_model(model="llama2", model_provider="ollama")
+@lru_cache(maxsize=8)
+def get_chat_model(model, provider, json_mode=False):
+    """Chat models are built once per (model, provider, json_mode) and reused, along with their HTTP clients."""
+    if provider == "ollama":
+        # Keep the model resident between steps instead of letting Ollama unload it when idle
+        kwargs = {"keep_alive": OLLAMA_KEEP_ALIVE}
+        if json_mode:
+            kwargs["format"] = "json"
+        return init_chat_model(model=model, model_provider=provider, **kwargs)
+    return init_chat_model(model=model, model_provider=provider)
+
+@lru_cache(maxsize=1)
+def get_tool_node():
+    return ToolNode([collect, summarize_articles, analyze_summaries, format_report, store_report])
+
+RESEARCH_SYSTEM_MESSAGE = SystemMessage(content="""You are an expert research assistant. Your task is to help create a detailed learning roadmap based on the user's topic and level.
+Use the available tools to gather information, summarize articles, analyze findings, format the report, and make the final report.
+When using tools, ensure to call them appropriately and handle their outputs correctly.""")
 
 def llm_node(state):
     """
     A node that uses the LLM to generate a response based on the current state.
     """
-    system_message = SystemMessage(content="""You are an expert research assistant. Your task is to help create a detailed learning roadmap based on the user's topic and level.
-Use the available tools to gather information, summarize articles, analyze findings, format the report, and make the final report.
-When using tools, ensure to call them appropriately and handle their outputs correctly.""")
-
-    messages_for_llm = [system_message] + state['messages']
+    messages_for_llm = [RESEARCH_SYSTEM_MESSAGE] + state['messages']
     response = llm.invoke(messages_for_llm)
-    return {'messages': state['messages'] + [response]}
+    # Append in place rather than copying the history on every graph step
+    state['messages'].append(response)
+    return state
 
 def router(state):
     """
@@ -197,14 +526,15 @@ def router(state):
     else:
         return 'end'
 
-def tools_node(state):
+async def tools_node(state):
     """
     A node that uses the tools to generate a response based on the current state.
     """
-    result = tool_node.invoke(state)
+    result = await get_tool_node().ainvoke(state)
     tool_output_messages = result.get('messages', [])
 
-    return {'messages': state['messages'] + tool_output_messages}
+    state['messages'].extend(tool_output_messages)
+    return state
 
 builder = StateGraph(ChatState)
 builder.add_node('llm', llm_node)
@@ -215,8 +545,12 @@ builder.add_conditional_edges('llm', router, {'tools': 'tools', 'end': END})
 
 graph = builder.compile()
 
-def run_research(query: str, user: str, model_provider: str = "Ollama", model: Optional[str] = None, chat_title: str = "Untitled"):
-    print(f"[research_handler.py]>RunResearch >>> run_research called with query={query}, user={user}, model_provider={model_provider}, model={model}, chat_title={chat_title}")
+NO_AGENT_RESPONSE = "No valid response from the agent after iterations."
+# Upper bound on a single LLM or tool step, so one hung backend call cannot stall the request forever
+AGENT_STEP_TIMEOUT = float(os.environ.get('AGENT_STEP_TIMEOUT', '300'))
+
+async def run_research(query: str, user: str, model_provider: str = "Ollama", model: Optional[str] = None, chat_title: str = "Untitled"):
+    logger.info("run_research called with query=%s, user=%s, model_provider=%s, model=%s, chat_title=%s", query, user, model_provider, model, chat_title)
     # initial_state: ChatState = {
     #     'messages': [HumanMessage(content=f"Please create a detailed research report on the topic: {query}")], # type: ignore
     #     'query': query
@@ -226,6 +560,23 @@ def run_research(query: str, user: str, model_provider: str = "Ollama", model: O
     # final_response = final_messages[-1] if final_messages else AIMessage(content="No response generated.")
     # print(f"[research_handler.py]>RunResearch >>> Final response: {final_response.content[:100]}")
 
+    # Repeat requests for the same topic reuse the finished report instead of rerunning every LLM step.
+    # Keyed on the models the pipeline actually runs; the requested provider/model are not used yet
+    normalized_query = " ".join(query.lower().split())
+    cache_key = hashlib.sha256(f"{llm.model}|{TOOL_PROVIDER}|{TOOL_MODEL}|{normalized_query}".encode('utf-8')).hexdigest()
+    cached = report_cache.get(cache_key)
+    if cached is not None:
+        logger.info("run_research cache hit for query=%s", query)
+        return cached
+
+    report, ok = await _run_agent(query)
+    # Provider errors, timeouts and empty replies are returned but never cached
+    if ok:
+        report_cache.set(cache_key, report)
+    return report
+
+async def _run_agent(query: str) -> tuple[str, bool]:
+    """Run the agent loop; returns (report, ok) where ok is False for errors, timeouts and incomplete runs."""
     initial_state = {
         'messages': [
             HumanMessage(content=f"Create a roadmap for the topic: {query}.")
@@ -235,32 +586,43 @@ def run_research(query: str, user: str, model_provider: str = "Ollama", model: O
 
     max_iterations = 20
     state = initial_state
+    finished = False
     for i in range(max_iterations):
         # Decide which node to run next
         last_message = state['messages'][-1]
         if isinstance(last_message, AIMessage) and getattr(last_message, 'tool_calls', None):
             # If the LLM suggests tool calls, run tools_node
-            state = tools_node(state)
-        elif isinstance(last_message, ToolMessage):
-            # If a tool was just called, run llm_node
-            state = llm_node(state)
+            step = tools_node(state)
         else:
-            # Otherwise, run llm_node to continue the conversation
-            state = llm_node(state)
-
-        # Check for a valid response
-        if state and 'messages' in state and state['messages']:
-            last_message = state['messages'][-1]
-            if isinstance(last_message, AIMessage):
-                return str(last_message.content)
-            elif isinstance(last_message, ToolMessage):
-                return str(last_message.content)
-            else:
-                return f"Agent response: {str(last_message.content)}"
-        
-        return "No valid response from the agent after iterations."
+            # After a tool result, or to start the conversation, run llm_node
+            # The LM Studio call is blocking; keep it off the event loop serving other requests.
+            # A timed-out thread keeps running, so it gets its own message list rather than the live one
+            step = asyncio.get_running_loop().run_in_executor(LLM_EXECUTOR, llm_node, {**state, 'messages': list(state['messages'])})
+
+        try:
+            state = await asyncio.wait_for(step, timeout=AGENT_STEP_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("run_research step %d timed out after %ss", i, AGENT_STEP_TIMEOUT)
+            break
+
+        # Stop once the LLM answers without asking for more tools
+        if router(state) == 'end':
+            finished = True
+            break
+
+    # Check for a valid response
+    if not state or not state.get('messages') or state['messages'][-1] is initial_state['messages'][0]:
+        return NO_AGENT_RESPONSE, False
+    last_message = state['messages'][-1]
+    content = str(last_message.content)
+    # Backend failures are flagged on the message itself: LM Studio errors in response_metadata, failed tools by status
+    failed = last_message.response_metadata.get("error") if isinstance(last_message, AIMessage) else getattr(last_message, 'status', None) == 'error'
+    ok = finished and bool(content.strip()) and not failed
+    return content, ok
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "WARNING").upper(),
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     # Example usage
-    report = run_research(query="Quantum computing advancements", user="test_user", model_provider="Ollama", model="llama2", chat_title="Quantum Computing Report")
+    report = asyncio.run(run_research(query="Quantum computing advancements", user="test_user", model_provider="Ollama", model="llama2", chat_title="Quantum Computing Report"))
     print(report)
\ No newline at end of file
@@ -1,18 +1,93 @@
 import os
-from datetime import datetime
+import atexit
+import logging
+import queue
+import threading
+import orjson
+from datetime import datetime, timezone
+
+# Flusher drains up to this many entries per write, or whatever arrived within the timeout
+AUDIT_BATCH_SIZE = 256
+AUDIT_BATCH_TIMEOUT = 0.05
+# AUDIT_ENABLED=0 turns log_action into a no-op, e.g. for benchmark and replay runs
+AUDIT_ENABLED = os.environ.get('AUDIT_ENABLED', '1') != '0'
+
+logger = logging.getLogger(__name__)
 
 class AuditLogger:
-    def __init__(self, log_file='audit.log'):
-        print(f"[audit.py] AuditLogger initialized with log_file={log_file}")
+    def __init__(self, log_file='audit.log', max_queue=10000):
+        logger.debug("AuditLogger initialized with log_file=%s", log_file)
         self.log_file = log_file
+        self.enabled = AUDIT_ENABLED
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        # Owned by the flusher thread: opened on the first batch and kept for the logger's lifetime
+        self._file = None
+        self._flusher = None
+        if not self.enabled:
+            return
+        self._flusher = threading.Thread(target=self._flush_loop, name='audit-flusher', daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
 
     def log_action(self, actor, action, details=None):
+        if not self.enabled:
+            return
         entry = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
             'actor': actor,
             'action': action,
             'details': details or {}
         }
-        print(f"[audit.py] Logging action: {entry}")
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(str(entry) + '\n')
+        # One JSON object per line; default=str keeps odd detail values from failing the call
+        line = orjson.dumps(entry, default=str, option=orjson.OPT_APPEND_NEWLINE)
+        logger.debug("Logging action: %s", entry)
+        # Audit storage is not urgent: hand the entry to the flusher instead of writing inline
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            logger.warning("Audit queue full, dropping entry: %s", entry)
+
+    def _flush_loop(self):
+        try:
+            self._drain()
+        finally:
+            if self._file is not None:
+                self._file.close()
+
+    def _drain(self):
+        while True:
+            line = self._queue.get()
+            if line is None:
+                return
+            batch = [line]
+            stop = False
+            while len(batch) < AUDIT_BATCH_SIZE:
+                try:
+                    line = self._queue.get(timeout=AUDIT_BATCH_TIMEOUT)
+                except queue.Empty:
+                    break
+                if line is None:
+                    stop = True
+                    break
+                batch.append(line)
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch):
+        try:
+            if self._file is None:
+                self._file = open(self.log_file, 'ab', buffering=64 * 1024)
+            self._file.write(b''.join(batch))
+            self._file.flush()
+        except OSError as e:
+            logger.error("Failed to write %d audit entries: %s", len(batch), e)
+
+    def close(self):
+        """Drain pending entries and stop the flusher."""
+        if self._closed or self._flusher is None:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._flusher.join()
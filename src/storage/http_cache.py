@@ -0,0 +1,80 @@
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import orjson
+
+logger = logging.getLogger(__name__)
+
+class HTTPCache:
+    """Content-addressed on-disk store for fetched pages, keyed by the SHA-256 of the URL."""
+
+    def __init__(self, base_dir='cache/http', max_age=86400):
+        logger.debug("HTTPCache initialized with base_dir=%s", base_dir)
+        self.base_dir = base_dir
+        self.max_age = max_age
+
+    def path_for(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.base_dir, key[:2], key)
+
+    def get(self, url):
+        """Return the cached body for url, or None if missing or older than max_age."""
+        path = self.path_for(url)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def load(self, url):
+        """Return (body, validators) regardless of age, for revalidating a stale entry; (None, {}) if missing."""
+        path = self.path_for(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                body = f.read()
+        except OSError:
+            return None, {}
+        try:
+            with open(path + '.meta', 'rb') as f:
+                validators = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            validators = {}
+        return body, validators
+
+    def set(self, url, body, validators=None):
+        """Store body plus its ETag/Last-Modified validators, if the server sent any."""
+        path = self.path_for(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            self._write(path, body.encode('utf-8'))
+            if validators:
+                self._write(path + '.meta', orjson.dumps(validators))
+            elif os.path.exists(path + '.meta'):
+                os.remove(path + '.meta')
+        except OSError as e:
+            logger.warning("Failed to cache %s: %s", url, e)
+
+    def touch(self, url):
+        """Mark a revalidated (304) entry fresh again without rewriting it."""
+        try:
+            os.utime(self.path_for(url))
+        except OSError:
+            pass
+
+    def _write(self, path, data):
+        # Write to a temp file in the same directory and rename, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
@@ -1,13 +1,32 @@
 import os
+import hashlib
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
 
 class Storage:
     def __init__(self, base_dir='results'):
-        print(f"[storage.py] Storage initialized with base_dir={base_dir}")
+        logger.debug("Storage initialized with base_dir=%s", base_dir)
         self.base_dir = base_dir
         os.makedirs(self.base_dir, exist_ok=True)
 
     def save_report(self, query, report):
-        filename = os.path.join(self.base_dir, f"{hash(query)}.txt")
-        print(f"[storage.py] Saving report to {filename}")
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(report)
+        # Stable across processes, unlike hash(), so the same query always maps to the same file
+        key = hashlib.blake2b(query.encode('utf-8'), digest_size=16).hexdigest()
+        filename = os.path.join(self.base_dir, f"{key}.txt")
+        logger.info("Saving report to %s", filename)
+        # Write to a temp file and rename, so a crash mid-write never leaves a truncated report
+        fd, tmp_path = tempfile.mkstemp(dir=self.base_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(report)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filename)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise